@@ -2,10 +2,115 @@ import streamlit as st
 import duckdb
 from datetime import datetime, date, time
 import pandas as pd
+import altair as alt
+import hashlib
 
 # הגדרת הדף
 st.set_page_config(page_title="דיווח משמרת", layout="centered", page_icon="📝")
 
+# עדכון טבלאות המשמרות והשעות לפי יום מתוך דיווחי הכניסה והיציאה
+# כאשר מועבר מספר אישי מחושבות מחדש רק המשמרות של אותו אדם, אחרת כל הטבלאות
+def refresh_shift_hours(con, personal_id=None):
+    # חיבור נפרד לאותו מסד נתונים, כדי שהטרנזקציה לא תתערבב עם משתמשים אחרים
+    cur = con.cursor()
+    cur.execute("BEGIN TRANSACTION")
+    try:
+        cur.execute("DELETE FROM shift_days WHERE ? IS NULL OR personal_id = ?", [personal_id, personal_id])
+        cur.execute("DELETE FROM shifts WHERE ? IS NULL OR personal_id = ?", [personal_id, personal_id])
+        # כל כניסה מוצמדת ליציאה הראשונה שאחריה, והמשך המשמרת מחושב פעם אחת
+        # כהפרש בין חותמות הזמן המלאות של תחילת וסיום המשמרת
+        cur.execute("""
+        INSERT INTO shifts
+        WITH entries AS (
+            SELECT 
+                personal_id,
+                reporter_name,
+                work_location,
+                CAST(timestamp AS TIMESTAMP) as entry_ts,
+                CAST(start_date AS DATE) + CAST(start_time AS TIME) as start_ts
+            FROM reports
+            WHERE report_type = 'entry'
+            AND start_date IS NOT NULL AND start_time IS NOT NULL
+            AND (? IS NULL OR personal_id = ?)
+        ),
+        exits AS (
+            SELECT 
+                personal_id,
+                CAST(timestamp AS TIMESTAMP) as exit_ts,
+                CAST(end_date AS DATE) + CAST(end_time AS TIME) as end_ts
+            FROM reports
+            WHERE report_type = 'exit'
+            AND end_date IS NOT NULL AND end_time IS NOT NULL
+            AND (? IS NULL OR personal_id = ?)
+        )
+        SELECT 
+            e.personal_id,
+            e.entry_ts,
+            e.reporter_name,
+            e.work_location,
+            e.start_ts,
+            x.end_ts,
+            CASE 
+                WHEN x.end_ts > e.start_ts THEN date_diff('second', e.start_ts, x.end_ts) / 3600.0
+                ELSE NULL
+            END as hours_worked
+        FROM entries e
+        ASOF LEFT JOIN exits x
+            ON e.personal_id = x.personal_id AND x.exit_ts > e.entry_ts
+        """, [personal_id, personal_id, personal_id, personal_id])
+        # פיצול כל משמרת לימים קלנדריים, כך שהשעות משויכות ליום, לשבוע (ראשון) ולחודש הנכונים
+        cur.execute("""
+        INSERT INTO shift_days
+        SELECT 
+            s.personal_id,
+            s.entry_ts,
+            CAST(d.day_start AS DATE) as work_date,
+            CAST(d.day_start AS DATE) - CAST(dayofweek(d.day_start) AS INTEGER) as week_start,
+            CAST(date_trunc('month', d.day_start) AS DATE) as month_start,
+            date_diff('second', greatest(s.start_ts, d.day_start), least(s.end_ts, d.day_start + INTERVAL 1 DAY)) / 3600.0 as hours
+        FROM shifts s,
+            unnest(range(date_trunc('day', s.start_ts), s.end_ts, INTERVAL 1 DAY)) as d(day_start)
+        WHERE s.hours_worked IS NOT NULL
+        AND (? IS NULL OR s.personal_id = ?)
+        """, [personal_id, personal_id])
+        cur.execute("COMMIT")
+    except Exception:
+        cur.execute("ROLLBACK")
+        raise
+    finally:
+        cur.close()
+
+# מפתח הגשה לפי תוכן הדיווח - אותו אדם, אותו סוג דיווח, אותו תאריך ואותה דקה (כפי שמוצגת בטופס)
+# כך שליחה חוזרת או לחיצה כפולה, גם בריצה חדשה או בחיבור מחדש, מקבלת את אותו המפתח
+def submission_key(personal_id, report_type, report_date, report_time):
+    content = f"{personal_id}|{report_type}|{report_date}|{report_time.strftime('%H:%M')}"
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+# מחיקת דיווחים כפולים - דיווח נמחק אם הוא מאותו סוג כמו הדיווח האחרון שנשמר לאותו אדם
+# ונמצא בתוך חלון הזמן ממנו. ההשוואה היא מול הדיווח שנשמר ולא מול הקודם שנמחק,
+# ודיווח מהסוג ההפוך באמצע (כניסה -> יציאה -> כניסה) שובר את הרצף
+def dedup_reports(con, window_minutes):
+    rows = con.execute("""
+        SELECT rowid, personal_id, report_type, CAST(timestamp AS TIMESTAMP)
+        FROM reports
+        ORDER BY personal_id, CAST(timestamp AS TIMESTAMP), rowid
+    """).fetchall()
+    window = pd.Timedelta(minutes=window_minutes)
+    last_kept = {}
+    duplicate_rowids = []
+    for rowid, personal_id, report_type, report_ts in rows:
+        kept = last_kept.get(personal_id)
+        if kept and kept[0] == report_type and report_ts - kept[1] <= window:
+            duplicate_rowids.append(rowid)
+        else:
+            last_kept[personal_id] = (report_type, report_ts)
+    if duplicate_rowids:
+        con.execute("DELETE FROM reports WHERE rowid IN (SELECT unnest(?::BIGINT[]))", [duplicate_rowids])
+    return len(duplicate_rowids)
+
+# גודל חלון הבסיס (בדקות) לספירת עדכוני ירוק בעיניים - חלונות התצוגה הם כפולות שלו
+GREEN_EYES_BUCKET_MINUTES = 15
+
 # התחברות לבסיס הנתונים
 @st.cache_resource
 def init_database():
@@ -30,6 +135,32 @@ def init_database():
             end_time TEXT
         )
         """)
+        # מפתח הגשה ייחודי - שליחה חוזרת של אותו טופס לא תיצור שורה נוספת
+        con.execute("ALTER TABLE reports ADD COLUMN IF NOT EXISTS submission_token TEXT")
+        con.execute("CREATE UNIQUE INDEX IF NOT EXISTS reports_submission_token_idx ON reports (submission_token)")
+        # טבלאות משמרות ושעות לפי יום - נגזרות מהדיווחים ונבנות מחדש בעליית המערכת
+        con.execute("""
+        CREATE OR REPLACE TABLE shifts (
+            personal_id TEXT,
+            entry_ts TIMESTAMP,
+            reporter_name TEXT,
+            work_location TEXT,
+            start_ts TIMESTAMP,
+            end_ts TIMESTAMP,
+            hours_worked DOUBLE
+        )
+        """)
+        con.execute("""
+        CREATE OR REPLACE TABLE shift_days (
+            personal_id TEXT,
+            entry_ts TIMESTAMP,
+            work_date DATE,
+            week_start DATE,
+            month_start DATE,
+            hours DOUBLE
+        )
+        """)
+        refresh_shift_hours(con)
         # יצירת טבלת ירוק בעיניים
         con.execute("""
         CREATE TABLE IF NOT EXISTS green_eyes (
@@ -41,6 +172,16 @@ def init_database():
             PRIMARY KEY (personal_id)
         )
         """)
+        # ספירת עדכוני ירוק בעיניים לפי חלונות זמן - מתעדכנת בכל דיווח
+        con.execute("""
+        CREATE TABLE IF NOT EXISTS green_eyes_buckets (
+            bucket_start TIMESTAMP,
+            personal_id TEXT,
+            on_shift TEXT,
+            updates INTEGER,
+            PRIMARY KEY (bucket_start, personal_id, on_shift)
+        )
+        """)
         return con
     except Exception as e:
         st.error(f"שגיאה בהתחברות למסד הנתונים: {e}")
@@ -284,11 +425,26 @@ if page == "ירוק בעיניים":
             else:
                 try:
                     timestamp = datetime.now()
-                    con.execute("""
-                        INSERT OR REPLACE INTO green_eyes (
-                            personal_id, reporter_name, current_location, on_shift, timestamp
-                        ) VALUES (?, ?, ?,?, ?)
-                    """, (personal_id, reporter_name, current_location.strip(),on_shift,timestamp))
+                    # המיקום והספירה בחלון הזמן נשמרים יחד או לא נשמרים בכלל
+                    cur = con.cursor()
+                    cur.execute("BEGIN TRANSACTION")
+                    try:
+                        cur.execute("""
+                            INSERT OR REPLACE INTO green_eyes (
+                                personal_id, reporter_name, current_location, on_shift, timestamp
+                            ) VALUES (?, ?, ?,?, ?)
+                        """, (personal_id, reporter_name, current_location.strip(),on_shift,timestamp))
+                        cur.execute("""
+                            INSERT INTO green_eyes_buckets (bucket_start, personal_id, on_shift, updates)
+                            VALUES (time_bucket(to_minutes(CAST(? AS INTEGER)), CAST(? AS TIMESTAMP)), ?, ?, 1)
+                            ON CONFLICT DO UPDATE SET updates = updates + 1
+                        """, (GREEN_EYES_BUCKET_MINUTES, timestamp, personal_id, on_shift))
+                        cur.execute("COMMIT")
+                    except Exception:
+                        cur.execute("ROLLBACK")
+                        raise
+                    finally:
+                        cur.close()
                     
                     st.success(f"✅ המיקום עודכן בהצלחה! {reporter_name} נמצא ב{current_location.strip()}")
                     st.balloons()
@@ -326,88 +482,62 @@ elif page == "ADMIN":
     admin_tab = st.selectbox("בחר סוג דיווח:", [
         "סיכום שעות עבודה", 
         "ירוק בעיניים - מעקב", 
+        "ירוק בעיניים - מפת חום",
         "ניהול נתונים"
     ])
     
     if admin_tab == "סיכום שעות עבודה":
         # הצגת דיווח שעות
-        st.subheader("📊 סיכום שעות עבודה השבוע")
+        period = st.radio("תקופה:", ["שבוע נוכחי", "חודש נוכחי"], horizontal=True)
+        st.subheader(f"📊 סיכום שעות עבודה - {period}")
         
         try:
-            # חישוב תאריכי השבוע הנוכחי (ראשון עד ראשון)
             today = date.today()
-            days_since_sunday = (today.weekday() + 1) % 7
-            week_start = today - pd.Timedelta(days=days_since_sunday)
-            week_end = week_start + pd.Timedelta(days=6)
+            if period == "שבוע נוכחי":
+                # חישוב תאריכי השבוע הנוכחי (ראשון עד ראשון)
+                days_since_sunday = (today.weekday() + 1) % 7
+                period_start = today - pd.Timedelta(days=days_since_sunday)
+                period_end = period_start + pd.Timedelta(days=6)
+                period_column = "week_start"
+            else:
+                period_start = today.replace(day=1)
+                period_end = (pd.Timestamp(period_start) + pd.offsets.MonthEnd(0)).date()
+                period_column = "month_start"
             
-            st.info(f"השבוע: {week_start.strftime('%d/%m/%Y')} - {week_end.strftime('%d/%m/%Y')}")
+            st.info(f"התקופה: {period_start.strftime('%d/%m/%Y')} - {period_end.strftime('%d/%m/%Y')}")
             
-            # שאילתה לחישוב שעות עבודה - מפושטת
-            hours_query = """
-            WITH entry_exits AS (
-                SELECT 
-                    e.personal_id,
-                    e.reporter_name,
-                    e.work_location,
-                    e.start_date,
-                    e.start_time,
-                    e.timestamp as entry_time,
-                    (SELECT x.end_date FROM reports x 
-                     WHERE x.personal_id = e.personal_id 
-                     AND x.report_type = 'exit' 
-                     AND x.timestamp > e.timestamp 
-                     ORDER BY x.timestamp LIMIT 1) as end_date,
-                    (SELECT x.end_time FROM reports x 
-                     WHERE x.personal_id = e.personal_id 
-                     AND x.report_type = 'exit' 
-                     AND x.timestamp > e.timestamp 
-                     ORDER BY x.timestamp LIMIT 1) as end_time
-                FROM reports e
-                WHERE e.report_type = 'entry'
-                AND DATE(e.start_date) >= ? 
-                AND DATE(e.start_date) <= ?
-            ),
-            calculated_hours AS (
+            # שאילתה לסיכום שעות עבודה - סכימה של שעות שחושבו מראש לכל יום במשמרת
+            hours_query = f"""
+            WITH period_hours AS (
                 SELECT 
                     personal_id,
-                    reporter_name,
-                    work_location,
-                    start_date,
-                    start_time,
-                    end_date,
-                    end_time,
-                    CASE 
-                        WHEN start_time IS NOT NULL AND end_time IS NOT NULL 
-                        AND start_date IS NOT NULL AND end_date IS NOT NULL THEN
-                            CASE 
-                                WHEN start_date = end_date THEN
-                                    (EXTRACT('hour' FROM CAST(end_time AS TIME)) * 60 + EXTRACT('minute' FROM CAST(end_time AS TIME))) -
-                                    (EXTRACT('hour' FROM CAST(start_time AS TIME)) * 60 + EXTRACT('minute' FROM CAST(start_time AS TIME)))
-                                ELSE
-                                    -- חישוב עבור משמרות שעוברות חצות
-                                    (24 * 60) - (EXTRACT('hour' FROM CAST(start_time AS TIME)) * 60 + EXTRACT('minute' FROM CAST(start_time AS TIME))) +
-                                    (EXTRACT('hour' FROM CAST(end_time AS TIME)) * 60 + EXTRACT('minute' FROM CAST(end_time AS TIME)))
-                            END / 60.0
-                        ELSE NULL
-                    END as hours_worked
-                FROM entry_exits
+                    entry_ts,
+                    SUM(hours) as period_hours,
+                    MIN(work_date) as first_date,
+                    MAX(work_date) as last_date
+                FROM shift_days
+                WHERE {period_column} = ?
+                GROUP BY personal_id, entry_ts
             )
             SELECT 
-                personal_id,
-                reporter_name,
-                work_location,
+                s.personal_id,
+                s.reporter_name,
+                s.work_location,
                 COUNT(*) as total_shifts,
-                COUNT(*) FILTER (WHERE hours_worked IS NOT NULL) as completed_shifts,
-                ROUND(SUM(COALESCE(hours_worked, 0)), 2) as total_hours,
-                ROUND(AVG(hours_worked), 2) as avg_hours_per_shift,
-                MIN(start_date) as first_shift_date,
-                MAX(COALESCE(end_date, start_date)) as last_shift_date
-            FROM calculated_hours
-            GROUP BY personal_id, reporter_name, work_location
+                COUNT(*) FILTER (WHERE s.hours_worked IS NOT NULL) as completed_shifts,
+                ROUND(SUM(COALESCE(p.period_hours, 0)), 2) as total_hours,
+                ROUND(SUM(p.period_hours) / NULLIF(COUNT(s.hours_worked), 0), 2) as avg_hours_per_shift,
+                MIN(COALESCE(p.first_date, CAST(s.start_ts AS DATE))) as first_shift_date,
+                MAX(COALESCE(p.last_date, CAST(s.start_ts AS DATE))) as last_shift_date
+            FROM shifts s
+            LEFT JOIN period_hours p ON p.personal_id = s.personal_id AND p.entry_ts = s.entry_ts
+            WHERE p.entry_ts IS NOT NULL
+            OR (s.hours_worked IS NULL AND CAST(s.start_ts AS DATE) BETWEEN ? AND ?)
+            GROUP BY s.personal_id, s.reporter_name, s.work_location
             ORDER BY total_hours DESC
             """
             
-            results = con.execute(hours_query, [week_start.strftime('%Y-%m-%d'), week_end.strftime('%Y-%m-%d')]).fetchall()
+            results = con.execute(hours_query, [period_start, period_start, period_end]).fetchall()
             
             if results:
                 # יצירת DataFrame להצגה
@@ -423,7 +553,7 @@ elif page == "ADMIN":
                 
                 col1, col2, col3 = st.columns(3)
                 with col1:
-                    st.metric("סה״כ שעות השבוע", f"{total_hours_all:.1f}")
+                    st.metric("סה״כ שעות בתקופה", f"{total_hours_all:.1f}")
                 with col2:
                     st.metric("סה״כ משמרות", total_shifts_all)
                 with col3:
@@ -442,7 +572,7 @@ elif page == "ADMIN":
                     chart_data = df.set_index('שם')['סה״כ שעות']
                     st.bar_chart(chart_data)
             else:
-                st.info("אין נתונים לשבוע הנוכחי")
+                st.info("אין נתונים לתקופה הנוכחית")
                 
         except Exception as e:
             st.error(f"שגיאה בטעינת נתוני השעות: {str(e)}")
@@ -493,6 +623,75 @@ elif page == "ADMIN":
             
         except Exception as e:
             st.error(f"שגיאה בטעינת נתוני ירוק בעיניים: {str(e)}")
+    elif admin_tab == "ירוק בעיניים - מפת חום":
+        st.subheader("🌡️ מפת חום - עמידה בדיווחי ירוק בעיניים")
+        
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            bucket_minutes = st.selectbox("חלון זמן (דקות):", [15, 30, 60, 120], index=1)
+        with col2:
+            hours_back = st.number_input("שעות אחורה:", min_value=1, max_value=72, step=1, value=12)
+        with col3:
+            on_shift_filter = st.radio("במשמרת:", ["הכל", "כן", "לא"], horizontal=True)
+        
+        try:
+            # סכימה של ספירות שנשמרו מראש בחלונות הבסיס - ללא מעבר על היסטוריית הדיווחים
+            window_end = pd.Timestamp(datetime.now()).floor(f"{bucket_minutes}min")
+            window_start = window_end - pd.Timedelta(hours=hours_back)
+            buckets_query = """
+            SELECT 
+                time_bucket(to_minutes(CAST(? AS INTEGER)), bucket_start) as bucket,
+                personal_id,
+                SUM(updates) as updates
+            FROM green_eyes_buckets
+            WHERE bucket_start >= ?
+            AND (? = 'הכל' OR on_shift = ?)
+            GROUP BY ALL
+            """
+            bucket_rows = con.execute(buckets_query, [
+                bucket_minutes, window_start.to_pydatetime(), on_shift_filter, on_shift_filter
+            ]).fetchall()
+            
+            # טבלה מלאה של כל האנשים מול כל החלונות, כך שחוסר דיווח מופיע כתא ריק
+            buckets = pd.date_range(window_start, window_end, freq=f"{bucket_minutes}min")
+            df_buckets = pd.DataFrame(bucket_rows, columns=['bucket', 'personal_id', 'updates'])
+            heatmap = (
+                df_buckets.pivot_table(index='personal_id', columns='bucket', values='updates', aggfunc='sum')
+                .reindex(index=list(personal_data.keys()), columns=buckets)
+                .fillna(0)
+                .rename(columns=lambda b: b.strftime('%d/%m %H:%M'))
+            )
+            
+            # אחוז הכיסוי בכל חלון - מי מתוך כלל האנשים דיווח לפחות פעם אחת
+            coverage = (heatmap > 0).mean() * 100
+            # החלון האחרון עדיין לא הסתיים - המדדים מחושבים רק על חלונות שהסתיימו
+            completed_coverage = coverage.iloc[:-1]
+            col1, col2 = st.columns(2)
+            with col1:
+                st.metric(
+                    "כיסוי בחלון האחרון שהסתיים",
+                    f"{completed_coverage.iloc[-1]:.0f}%" if len(completed_coverage) else "—"
+                )
+            with col2:
+                st.metric(
+                    "כיסוי ממוצע (חלונות שהסתיימו)",
+                    f"{completed_coverage.mean():.0f}%" if len(completed_coverage) else "—"
+                )
+            
+            heatmap_long = heatmap.rename(index=personal_data).rename_axis(index='שם', columns='חלון').stack().reset_index(name='עדכונים')
+            chart = alt.Chart(heatmap_long).mark_rect().encode(
+                x=alt.X('חלון:O', sort=list(heatmap.columns), title='חלון זמן'),
+                y=alt.Y('שם:N', title=None),
+                color=alt.Color('עדכונים:Q', scale=alt.Scale(scheme='greens')),
+                tooltip=['שם', 'חלון', 'עדכונים']
+            ).properties(height=16 * len(heatmap))
+            st.altair_chart(chart, use_container_width=True)
+            
+            st.subheader("📈 אחוז כיסוי לפי חלון זמן")
+            st.bar_chart(coverage)
+            
+        except Exception as e:
+            st.error(f"שגיאה בטעינת מפת החום: {str(e)}")
     elif admin_tab == "ניהול נתונים":
         st.subheader("🗂️ ניהול נתונים")
         
@@ -505,6 +704,7 @@ elif page == "ADMIN":
                 if st.session_state.get('confirm_green_eyes_reset', False):
                     try:
                         con.execute("DELETE FROM green_eyes")
+                        con.execute("DELETE FROM green_eyes_buckets")
                         st.success("✅ נתוני ירוק בעיניים נמחקו בהצלחה!")
                         st.session_state.confirm_green_eyes_reset = False
                         st.rerun()
@@ -519,6 +719,7 @@ elif page == "ADMIN":
                 if st.session_state.get('confirm_reports_reset', False):
                     try:
                         con.execute("DELETE FROM reports")
+                        refresh_shift_hours(con)
                         st.success("✅ נתוני דיווחי המשמרות נמחקו בהצלחה!")
                         st.session_state.confirm_reports_reset = False
                         st.rerun()
@@ -528,10 +729,31 @@ elif page == "ADMIN":
                     st.session_state.confirm_reports_reset = True
                     st.warning("לחץ שוב לאישור המחיקה")
         
+        # איחוד דיווחים כפולים (לחיצות חוזרות על "שלח דיווח")
+        st.markdown("---")
+        st.markdown("**🧹 איחוד דיווחים כפולים**")
+        dedup_window = st.number_input(
+            "חלון זמן בדקות - דיווח זהה (אותו אדם ואותו סוג) בתוך החלון יימחק:",
+            min_value=1, max_value=60, step=1, value=5
+        )
+        if st.button("🧹 איחוד דיווחים כפולים", type="secondary"):
+            if st.session_state.get('confirm_reports_dedup', False):
+                try:
+                    removed = dedup_reports(con, dedup_window)
+                    refresh_shift_hours(con)
+                    st.success(f"✅ נמחקו {removed} דיווחים כפולים")
+                    st.session_state.confirm_reports_dedup = False
+                except Exception as e:
+                    st.error(f"❌ שגיאה באיחוד הדיווחים: {str(e)}")
+            else:
+                st.session_state.confirm_reports_dedup = True
+                st.warning("לחץ שוב לאישור האיחוד")
+        
         # איפוס סטטוס האישורים
         if st.button("❌ ביטול", type="primary"):
             st.session_state.confirm_green_eyes_reset = False
             st.session_state.confirm_reports_reset = False
+            st.session_state.confirm_reports_dedup = False
             st.rerun()
     
     # כפתור יציאה
@@ -652,16 +874,18 @@ else:
             elif reporter_name == "מספר לא נמצא":
                 st.error("❌ מספר אישי לא תקין")
             else:
+                inserted = False
                 try:
                     timestamp = datetime.now().isoformat()
                     
-                    con.execute("""
-                        INSERT INTO reports (
+                    inserted = con.execute("""
+                        INSERT OR IGNORE INTO reports (
                             report_type, personal_id, reporter_name, unit_commander,
                             work_location, replacing_who, replacement_person,
                             reports_count, special_notes, timestamp,
-                            start_date, start_time, end_date, end_time
-                        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                            start_date, start_time, end_date, end_time,
+                            submission_token
+                        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
                     """, (
                         report_type, 
                         personal_id,
@@ -676,14 +900,30 @@ else:
                         str(start_date) if start_date else None,
                         str(start_time) if start_time else None,
                         str(end_date) if end_date else None,
-                        str(end_time) if end_time else None
-                    ))
+                        str(end_time) if end_time else None,
+                        submission_key(
+                            personal_id,
+                            report_type,
+                            start_date if report_type == "entry" else end_date,
+                            start_time if report_type == "entry" else end_time
+                        )
+                    )).fetchone()[0]
                     
-                    st.success("✅ הדיווח נשלח בהצלחה!")
-                    st.balloons()
+                    if inserted:
+                        st.success("✅ הדיווח נשלח בהצלחה!")
+                        st.balloons()
+                    else:
+                        st.info("ℹ️ הדיווח כבר התקבל - לא נשמר פעם נוספת")
                     
                 except Exception as e:
                     st.error(f"❌ שגיאה בשמירת הדיווח: {str(e)}")
+                
+                # עדכון סיכום השעות של המדווח בלבד - הדיווח עצמו כבר נשמר
+                if inserted:
+                    try:
+                        refresh_shift_hours(con, personal_id)
+                    except Exception as e:
+                        st.warning(f"⚠️ הדיווח נשמר, אך עדכון סיכום השעות נכשל: {str(e)}")
 
     # קו הפרדה
     st.markdown("---")